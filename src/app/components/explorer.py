@@ -1,18 +1,16 @@
 """Preference Explorer UI component."""
 
 import pandas as pd
+import plotly.io as pio
 import streamlit as st
 
-from src.app.utils.analytics import (
-    calculate_competition_index,
-    calculate_option_popularity,
-    calculate_weighted_popularity,
-)
+from src.app.utils.analytics import analytics_bundle, calculate_competition_index
 from src.app.utils.visualizations import (
     create_competition_index_chart,
     create_preference_heatmap,
     create_weighted_popularity_chart,
 )
+from src.types import PreferenceIndex
 
 
 def render_explorer(
@@ -20,11 +18,14 @@ def render_explorer(
     participants: list[str],
     options: list[str],
     preferences: dict[str, list[tuple[str, int]]],
+    preference_index: PreferenceIndex,
     num_choices: int,
 ) -> None:
     """Render the preference explorer section with multiple tabs."""
     st.header("📋 Preference Explorer")
 
+    analytics = analytics_bundle(preference_index, num_choices)
+
     explorer_tabs = st.tabs(
         [
             "Full Table",
@@ -71,8 +72,8 @@ def render_explorer(
                 "Top/Bottom K options", 3, min(10, len(options)), 5, key="popularity_k"
             )
 
-        popularity_df = calculate_option_popularity(options, preferences)
-        weighted_df = calculate_weighted_popularity(options, preferences)
+        popularity_df = analytics.popularity
+        weighted_df = analytics.weighted_popularity
 
         col1, col2 = st.columns(2)
 
@@ -92,7 +93,7 @@ def render_explorer(
 
             # Bar chart
             fig = create_weighted_popularity_chart(weighted_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(pio.from_json(fig), use_container_width=True)
 
     with explorer_tabs[3]:
         st.subheader("Competition Index")
@@ -108,7 +109,7 @@ def render_explorer(
             value=3,
             key="comp_capacity",
         )
-        competition_df = calculate_competition_index(options, preferences, capacity)
+        competition_df = calculate_competition_index(analytics.top2_demand, capacity)
 
         col1, col2 = st.columns([1, 2])
 
@@ -117,10 +118,10 @@ def render_explorer(
 
         with col2:
             fig = create_competition_index_chart(competition_df)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(pio.from_json(fig), use_container_width=True)
 
     with explorer_tabs[4]:
         st.subheader("Preference Heatmap")
         st.markdown("Shows how often each option appears at each preference rank.")
-        fig = create_preference_heatmap(options, preferences, num_choices)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = create_preference_heatmap(analytics.rank_counts)
+        st.plotly_chart(pio.from_json(fig), use_container_width=True)
@@ -1,9 +1,10 @@
 """Results Dashboard UI component."""
 
 import pandas as pd
+import plotly.io as pio
 import streamlit as st
 
-from src.app.utils.analytics import calculate_competition_index, get_results_csv
+from src.app.utils.analytics import build_results_table
 from src.app.utils.visualizations import (
     create_option_fill_pie_chart,
     create_preference_distribution_chart,
@@ -17,9 +18,9 @@ def render_results_dashboard(
     participants: list[str],
     options: list[str],
     preferences: dict[str, list[tuple[str, int]]],
+    high_demand_options: frozenset[str],
     num_choices: int,
     min_quota: int,
-    max_quota: int,
 ) -> None:
     """Render the results dashboard with metrics and detailed tabs."""
     st.header("📈 Results Dashboard")
@@ -27,6 +28,11 @@ def render_results_dashboard(
     # Status badge
     if result.status == SolverStatus.OPTIMAL:
         st.success(f"✅ Solver Status: **{result.status.value}**")
+    elif result.status == SolverStatus.FEASIBLE:
+        st.warning(
+            f"⚠️ Solver Status: **{result.status.value}** "
+            "(time limit reached before the solution was proven optimal)"
+        )
     else:
         st.error(f"❌ Solver Status: **{result.status.value}**")
 
@@ -82,7 +88,7 @@ def render_results_dashboard(
 
     with col1:
         fig = create_preference_distribution_chart(dist_data)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(pio.from_json(fig), use_container_width=True)
 
     with col2:
         # Option fill rate pie chart
@@ -95,31 +101,32 @@ def render_results_dashboard(
 
         if any(v > 0 for v in fill_counts.values()):
             fig = create_option_fill_pie_chart(fill_counts)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(pio.from_json(fig), use_container_width=True)
 
     # Detailed Results Section
     st.header("📋 Detailed Results")
 
+    results_df, csv_content = build_results_table(result)
+
     result_tabs = st.tabs(
         ["All Assignments", "Participant Lookup", "Option Breakdown", "Insights"]
     )
 
     with result_tabs[0]:
-        _render_all_assignments_tab(result)
+        _render_all_assignments_tab(results_df)
 
     with result_tabs[1]:
         _render_participant_lookup_tab(result, participants, preferences)
 
     with result_tabs[2]:
-        _render_option_breakdown_tab(result, metrics)
+        _render_option_breakdown_tab(result, metrics, results_df)
 
     with result_tabs[3]:
-        _render_insights_tab(result, options, preferences, max_quota, num_choices)
+        _render_insights_tab(result, results_df, high_demand_options, num_choices)
 
     # Download Results
     st.header("📥 Download Results")
 
-    csv_content = get_results_csv(result)
     st.download_button(
         label="Download Results CSV",
         data=csv_content,
@@ -128,26 +135,28 @@ def render_results_dashboard(
     )
 
 
-def _render_all_assignments_tab(result) -> None:
+def _render_all_assignments_tab(results_df: pd.DataFrame) -> None:
     """Render the All Assignments tab."""
     st.subheader("All Participant Assignments")
 
-    assignments_data = []
-    for participant, assignment in sorted(result.participant_assignments.items()):
-        assignments_data.append(
-            {
-                "Participant": participant,
-                "Assigned Option": assignment.option if assignment.option else "—",
-                "Preference Rank": assignment.preference_rank or "—",
-                "Score": assignment.preference_score,
-                "Status": assignment.status.value,
-            }
-        )
-
-    assignments_df = pd.DataFrame(assignments_data)
+    assignments_df = results_df.rename(
+        columns={
+            "participant_id": "Participant",
+            "assigned_option": "Assigned Option",
+            "preference_rank": "Preference Rank",
+            "preference_score": "Score",
+            "status": "Status",
+        }
+    )
+    assignments_df["Assigned Option"] = assignments_df["Assigned Option"].replace("", "—")
+    ranks = assignments_df["Preference Rank"]
+    # where() swaps in the dash without fillna's object-downcasting FutureWarning
+    assignments_df["Preference Rank"] = ranks.astype(object).where(ranks.notna(), "—")
     st.dataframe(assignments_df, use_container_width=True, height=400, hide_index=True)
 
 
+# Tabs with widgets are fragments: picking a participant or option reruns only that tab
+@st.fragment
 def _render_participant_lookup_tab(
     result, participants: list[str], preferences: dict[str, list[tuple[str, int]]]
 ) -> None:
@@ -181,73 +190,84 @@ def _render_participant_lookup_tab(
                     st.write(f"{rank}. {option} (score: {score}) {marker}")
 
 
-def _render_option_breakdown_tab(result, metrics) -> None:
+def _option_breakdown_lists(result, metrics) -> tuple[list[str], str]:
+    """Sorted active options and the unused-options label, computed once per result.
+
+    Selectbox changes rerun the whole script; the lists only change with a new solve.
+    """
+    cached = st.session_state.get("option_breakdown_lists")
+    # The entry keeps a reference to its result, so the identity check cannot be fooled
+    if cached is None or cached[0] is not result:
+        active = sorted(opt for opt, count in result.option_counts.items() if count > 0)
+        unused = ", ".join(sorted(metrics.unused_options))
+        cached = (result, active, unused)
+        st.session_state.option_breakdown_lists = cached
+    return cached[1], cached[2]
+
+
+@st.fragment
+def _render_option_breakdown_tab(result, metrics, results_df: pd.DataFrame) -> None:
     """Render the Option Breakdown tab."""
     st.subheader("Option Breakdown")
 
-    # Filter to active options
-    active_options = [opt for opt, count in result.option_counts.items() if count > 0]
+    active_options, unused_options = _option_breakdown_lists(result, metrics)
 
     if active_options:
-        selected_option = st.selectbox(
-            "Select an option", sorted(active_options), key="option_breakdown"
-        )
+        selected_option = st.selectbox("Select an option", active_options, key="option_breakdown")
 
         if selected_option:
-            assigned_participants = result.assignments.get(selected_option, [])
+            assigned_participants = result.assignments.get(selected_option, ())
             count = len(assigned_participants)
             st.write(f"**{selected_option}** — {count} participants")
 
             if assigned_participants:
-                option_data = []
-                for p in assigned_participants:
-                    assignment = result.participant_assignments.get(p)
-                    if assignment:
-                        option_data.append(
-                            {
-                                "Participant": p,
-                                "Preference Rank": assignment.preference_rank,
-                                "Score": assignment.preference_score,
-                            }
-                        )
-                option_df = pd.DataFrame(option_data)
+                # One vectorized filter over the shared results table, ordered by participant
+                option_rows = results_df[results_df["assigned_option"] == selected_option]
+                option_df = option_rows[
+                    ["participant_id", "preference_rank", "preference_score"]
+                ].rename(
+                    columns={
+                        "participant_id": "Participant",
+                        "preference_rank": "Preference Rank",
+                        "preference_score": "Score",
+                    }
+                )
                 st.dataframe(option_df, use_container_width=True, hide_index=True)
     else:
         st.warning("No active options found.")
 
     # Show unused options
-    if metrics.unused_options:
+    if unused_options:
         st.write("**Unused Options:**")
-        st.write(", ".join(sorted(metrics.unused_options)))
+        st.write(unused_options)
 
 
 def _render_insights_tab(
     result,
-    options: list[str],
-    preferences: dict[str, list[tuple[str, int]]],
-    max_quota: int,
+    results_df: pd.DataFrame,
+    high_demand_options: frozenset[str],
     num_choices: int,
 ) -> None:
     """Render the Insights tab."""
     st.subheader("Additional Insights")
 
     # Lucky participants: got 1st choice for a high-demand option
-    competition_df = calculate_competition_index(options, preferences, max_quota)
-    high_demand_options = set(
-        competition_df[competition_df["Competition Index"] >= 1.0]["Option"]
-    )
-
-    lucky = []
-    for p, assignment in result.participant_assignments.items():
-        if assignment.preference_rank == 1 and assignment.option in high_demand_options:
-            lucky.append((p, assignment.option))
+    lucky_df = results_df[
+        results_df["preference_rank"].eq(1).fillna(False)
+        & results_df["assigned_option"].isin(high_demand_options)
+    ]
 
-    if lucky:
+    if not lucky_df.empty:
         st.write("**Lucky Participants** (got 1st choice for high-demand option):")
-        for p, opt in lucky[:10]:
-            st.write(f"- {p} → {opt}")
-        if len(lucky) > 10:
-            st.write(f"... and {len(lucky) - 10} more")
+        st.dataframe(
+            lucky_df.head(10)[["participant_id", "assigned_option"]].rename(
+                columns={"participant_id": "Participant", "assigned_option": "Option"}
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if len(lucky_df) > 10:
+            st.write(f"... and {len(lucky_df) - 10} more")
     else:
         st.write("No participants got 1st choice for a high-demand option.")
 
@@ -255,4 +275,4 @@ def _render_insights_tab(
     st.write("**Individual Satisfaction Scores:**")
     scores = [a.preference_score for a in result.participant_assignments.values()]
     fig = create_satisfaction_histogram(scores, num_choices)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(pio.from_json(fig), use_container_width=True)
@@ -1,16 +1,41 @@
 """Solver Controls UI component."""
 
-import random
-
 import streamlit as st
 
-from src.solver import solve_assignment
+from src.app.utils.analytics import high_demand_options
+from src.types import PreferenceIndex, SolverResult
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_solve(
+    participants: list[str],
+    options: list[str],
+    preferences: dict[str, list[tuple[str, int]]],
+    min_quota: int,
+    max_quota: int,
+    option_weight: float,
+    seed: int | None,
+) -> SolverResult:
+    """Solve, reusing the previous result when the same inputs are submitted again."""
+    # Imported here so browsing the explorer never pays for loading PuLP
+    from src.solver import solve_assignment
+
+    return solve_assignment(
+        participants=participants,
+        options=options,
+        preferences=preferences,
+        min_quota=min_quota,
+        max_quota=max_quota,
+        option_weight=option_weight,
+        seed=seed,
+    )
 
 
 def render_solver_controls(
     participants: list[str],
     options: list[str],
     preferences: dict[str, list[tuple[str, int]]],
+    preference_index: PreferenceIndex,
 ) -> None:
     """Render the solver settings and run button."""
     st.header("⚙️ Solver Settings")
@@ -48,21 +73,17 @@ def render_solver_controls(
 
     if st.button("🚀 Run Solver", type="primary"):
         with st.spinner("Solving assignment problem..."):
-            # Optionally shuffle participants
-            solve_participants = participants.copy()
-            if seed > 0:
-                random.seed(seed)
-                random.shuffle(solve_participants)
-
-            result = solve_assignment(
-                participants=solve_participants,
-                options=options,
-                preferences=preferences,
-                min_quota=min_quota,
-                max_quota=max_quota,
-                option_weight=option_weight,
+            result = _cached_solve(
+                participants,
+                options,
+                preferences,
+                min_quota,
+                max_quota,
+                option_weight,
+                seed if seed > 0 else None,
             )
             st.session_state.result = result
             # Store solver params for results dashboard
             st.session_state.min_quota = min_quota
             st.session_state.max_quota = max_quota
+            st.session_state.high_demand = high_demand_options(preference_index, max_quota)
@@ -1,7 +1,6 @@
 """Streamlit app for the Preference Assignment Optimizer."""
 
-import tempfile
-from pathlib import Path
+import io
 
 import pandas as pd
 import streamlit as st
@@ -9,7 +8,26 @@ import streamlit as st
 from src.app.components.explorer import render_explorer
 from src.app.components.results import render_results_dashboard
 from src.app.components.solver_controls import render_solver_controls
-from src.data_loader import load_preferences_from_csv
+from src.data_loader import (
+    build_preference_index,
+    load_preferences_from_csv,
+    read_preferences_csv,
+)
+from src.types import PreferenceIndex
+
+
+# Each entry holds a full parsed upload, so keep only a handful of recent files
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_uploaded_csv(
+    data: bytes,
+) -> tuple[
+    list[str], list[str], dict[str, list[tuple[str, int]]], pd.DataFrame, PreferenceIndex
+]:
+    """Parse uploaded CSV bytes; cached so reruns with the same file skip parsing."""
+    raw_df = read_preferences_csv(io.BytesIO(data))
+    participants, options, preferences = load_preferences_from_csv(raw_df)
+    preference_index = build_preference_index(participants, options, preferences)
+    return participants, options, preferences, raw_df, preference_index
 
 
 def main():
@@ -36,25 +54,19 @@ def main():
     )
 
     if uploaded_file is not None:
-        # Save to temp file for load_preferences_from_csv
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="wb") as tmp:
-            tmp.write(uploaded_file.getvalue())
-            tmp_path = tmp.name
-
         try:
-            participants, options, preferences = load_preferences_from_csv(tmp_path)
+            participants, options, preferences, raw_df, preference_index = (
+                _load_uploaded_csv(uploaded_file.getvalue())
+            )
             st.session_state.participants = participants
             st.session_state.options = options
             st.session_state.preferences = preferences
+            st.session_state.preference_index = preference_index
             st.session_state.data_loaded = True
-
-            # Read raw data for display
-            uploaded_file.seek(0)
-            raw_df = pd.read_csv(uploaded_file)
             st.session_state.raw_df = raw_df
 
-            # Determine number of choices
-            num_choices = len([c for c in raw_df.columns if c.startswith("choice")])
+            # Every column after the participant ID is a choice, as in the loader
+            num_choices = len(raw_df.columns) - 1
             st.session_state.num_choices = num_choices
 
             st.success(
@@ -65,9 +77,6 @@ def main():
         except Exception as e:
             st.error(f"Error loading CSV: {e}")
             st.session_state.data_loaded = False
-        finally:
-            # Clean up temp file
-            Path(tmp_path).unlink(missing_ok=True)
 
     if not st.session_state.data_loaded:
         st.info("Upload a CSV file to get started.")
@@ -77,27 +86,28 @@ def main():
     participants = st.session_state.participants
     options = st.session_state.options
     preferences = st.session_state.preferences
+    preference_index = st.session_state.preference_index
     raw_df = st.session_state.raw_df
     num_choices = st.session_state.num_choices
 
     # --- Render Components ---
-    render_explorer(raw_df, participants, options, preferences, num_choices)
+    render_explorer(raw_df, participants, options, preferences, preference_index, num_choices)
 
-    render_solver_controls(participants, options, preferences)
+    render_solver_controls(participants, options, preferences, preference_index)
 
     # --- Results Dashboard ---
     if st.session_state.result is not None:
         result = st.session_state.result
         min_quota = st.session_state.get("min_quota", 2)
-        max_quota = st.session_state.get("max_quota", 3)
+        high_demand = st.session_state.get("high_demand", frozenset())
         render_results_dashboard(
             result,
             participants,
             options,
             preferences,
+            high_demand,
             num_choices,
             min_quota,
-            max_quota,
         )
 
 
@@ -1,92 +1,123 @@
 """Analytics functions for preference data analysis."""
 
-from collections import Counter
+from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from src.types import PreferenceIndex
 
-@st.cache_data
-def calculate_option_popularity(
-    options: list[str], preferences: dict[str, list[tuple[str, int]]]
-) -> pd.DataFrame:
-    """Calculate how many times each option was selected (at any rank)."""
-    counts: Counter[str] = Counter()
-    for prefs in preferences.values():
-        for option, _ in prefs:
-            counts[option] += 1
 
-    # Include options with 0 selections
-    for option in options:
-        if option not in counts:
-            counts[option] = 0
+@dataclass
+class PreferenceAnalytics:
+    """Per-option aggregates derived from a single pass over the preferences."""
 
-    df = pd.DataFrame(
-        [(option, count) for option, count in counts.items()],
-        columns=["Option", "Total Selections"],
-    )
-    return df.sort_values("Total Selections", ascending=False).reset_index(drop=True)
+    popularity: pd.DataFrame  # Option, Total Selections
+    weighted_popularity: pd.DataFrame  # Option, Weighted Score
+    top2_demand: pd.DataFrame  # Option, Top-2 Demand
+    rank_counts: pd.DataFrame  # option x "Rank i" counts, sorted by option
 
 
-@st.cache_data
-def calculate_weighted_popularity(
-    options: list[str], preferences: dict[str, list[tuple[str, int]]]
-) -> pd.DataFrame:
-    """Calculate weighted popularity (1st choice = 5pts, 5th = 1pt)."""
-    scores: Counter[str] = Counter()
-    for prefs in preferences.values():
-        for option, score in prefs:
-            scores[option] += score
+def _rank_matrix(option_codes: np.ndarray, num_options: int, num_ranks: int) -> np.ndarray:
+    """Count each option at each rank: (num_options, num_ranks) int64 matrix."""
+    codes = option_codes[:, :num_ranks]
+    valid = codes >= 0
+    ranks = np.nonzero(valid)[1]
+    # Flatten (option, rank) cells into one id so a single bincount does the counting
+    flat = np.bincount(codes[valid] * num_ranks + ranks, minlength=num_options * num_ranks)
+    return flat.reshape(num_options, num_ranks)
 
-    # Include options with 0 score
-    for option in options:
-        if option not in scores:
-            scores[option] = 0
 
-    df = pd.DataFrame(
-        [(option, score) for option, score in scores.items()],
-        columns=["Option", "Weighted Score"],
+def _weighted_scores(option_codes: np.ndarray, scores: np.ndarray, num_options: int) -> np.ndarray:
+    """Sum preference scores per option."""
+    valid = option_codes >= 0
+    weighted = np.bincount(option_codes[valid], weights=scores[valid], minlength=num_options)
+    return weighted.astype(np.int64)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def analytics_bundle(index: PreferenceIndex, num_choices: int) -> PreferenceAnalytics:
+    """Build all explorer aggregates from one (option x rank) count matrix."""
+    options = index.options
+    rank_matrix = _rank_matrix(index.option_codes, len(options), num_choices)
+    weighted = _weighted_scores(
+        index.option_codes[:, :num_choices], index.scores[:, :num_choices], len(options)
     )
-    return df.sort_values("Weighted Score", ascending=False).reset_index(drop=True)
 
+    option_labels = np.asarray(options, dtype=object)
 
-@st.cache_data
-def calculate_competition_index(
-    options: list[str], preferences: dict[str, list[tuple[str, int]]], capacity: int = 3
-) -> pd.DataFrame:
-    """Calculate competition index (demand / capacity) per option."""
-    # Count how many participants have each option as 1st or 2nd choice
-    demand: Counter[str] = Counter()
-    for prefs in preferences.values():
-        for idx, (option, _) in enumerate(prefs[:2]):  # Top 2 choices
-            demand[option] += 1
+    def ranked(values: np.ndarray, column: str) -> pd.DataFrame:
+        # Build the frame already in descending order; ties keep option order
+        order = np.argsort(-values, kind="stable")
+        return pd.DataFrame({"Option": option_labels[order], column: values[order]})
 
-    for option in options:
-        if option not in demand:
-            demand[option] = 0
+    rank_counts = pd.DataFrame(
+        rank_matrix,
+        index=options,
+        columns=[f"Rank {i}" for i in range(1, num_choices + 1)],
+    ).sort_index()
 
-    df = pd.DataFrame(
-        [
-            (option, count, round(count / capacity, 2))
-            for option, count in demand.items()
-        ],
-        columns=["Option", "Top-2 Demand", "Competition Index"],
+    return PreferenceAnalytics(
+        popularity=ranked(rank_matrix.sum(axis=1), "Total Selections"),
+        weighted_popularity=ranked(weighted, "Weighted Score"),
+        top2_demand=ranked(rank_matrix[:, :2].sum(axis=1), "Top-2 Demand"),
+        rank_counts=rank_counts,
+    )
+
+
+def calculate_competition_index(top2_demand: pd.DataFrame, capacity: int = 3) -> pd.DataFrame:
+    """Calculate competition index (top-2 demand / capacity) per option."""
+    demand = top2_demand["Top-2 Demand"].to_numpy()
+    # The index is demand scaled by a positive constant, so the demand order already holds
+    return pd.DataFrame(
+        {
+            "Option": top2_demand["Option"].to_numpy(),
+            "Top-2 Demand": demand,
+            "Competition Index": np.round(demand / capacity, 2),
+        }
     )
-    return df.sort_values("Competition Index", ascending=False).reset_index(drop=True)
 
 
-@st.cache_data
-def get_results_csv(result) -> str:
-    """Generate CSV content from results."""
-    from io import StringIO
+def high_demand_options(index: PreferenceIndex, capacity: int) -> frozenset[str]:
+    """Options whose top-2 demand reaches capacity (competition index >= 1.0)."""
+    demand = _rank_matrix(index.option_codes, len(index.options), 2).sum(axis=1)
+    return frozenset(index.options[i] for i in np.flatnonzero(demand >= capacity))
+
+
+RESULTS_COLUMNS = [
+    "participant_id",
+    "assigned_option",
+    "preference_rank",
+    "preference_score",
+    "status",
+]
 
-    output = StringIO()
-    output.write(
-        "participant_id,assigned_option,preference_rank,preference_score,status\n"
+
+@st.cache_data(max_entries=16)
+def build_results_table(result) -> tuple[pd.DataFrame, bytes]:
+    """Build the per-participant assignments table and its CSV export in one pass.
+
+    Returns:
+        Tuple of (table sorted by participant, UTF-8 CSV bytes of that table).
+    """
+    participants = sorted(result.participant_assignments)
+    assignments = [result.participant_assignments[p] for p in participants]
+    # Column-wise construction skips the row-to-column transpose of a list of rows
+    df = pd.DataFrame(
+        {
+            "participant_id": participants,
+            "assigned_option": [a.option for a in assignments],
+            "preference_rank": pd.array(
+                [a.preference_rank for a in assignments], dtype="Int64"
+            ),
+            "preference_score": np.fromiter(
+                (a.preference_score for a in assignments),
+                dtype=np.int64,
+                count=len(assignments),
+            ),
+            "status": [a.status.value for a in assignments],
+        },
+        columns=RESULTS_COLUMNS,
     )
-    for participant, assignment in sorted(result.participant_assignments.items()):
-        output.write(
-            f"{participant},{assignment.option},{assignment.preference_rank or ''},"
-            f"{assignment.preference_score},{assignment.status.value}\n"
-        )
-    return output.getvalue()
+    return df, df.to_csv(index=False).encode()
@@ -1,58 +1,56 @@
-"""Visualization functions for creating Plotly charts."""
+"""Visualization functions for creating Plotly charts.
+
+Builders return the figure as Plotly JSON: a cache hit then hands back a plain string
+instead of unpickling a Figure, and pio.from_json rebuilds it faster than unpickling.
+Plotly is imported inside each builder so pages that draw no chart skip its cold import.
+"""
 
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 
 
-@st.cache_data
-def create_preference_heatmap(
-    options: list[str],
-    preferences: dict[str, list[tuple[str, int]]],
-    num_choices: int = 5,
-) -> go.Figure:
+@st.cache_data(show_spinner=False, max_entries=8)
+def create_preference_heatmap(rank_counts: pd.DataFrame) -> str:
     """Create a heatmap showing how often each option appears at each rank."""
-    # Initialize count matrix
-    rank_counts: dict[str, dict[int, int]] = {
-        option: {r: 0 for r in range(1, num_choices + 1)} for option in options
-    }
-
-    for prefs in preferences.values():
-        for rank, (option, _) in enumerate(prefs, start=1):
-            if rank <= num_choices:
-                rank_counts[option][rank] += 1
-
-    # Create DataFrame for heatmap
-    df = pd.DataFrame(rank_counts).T
-    df.columns = [f"Rank {i}" for i in range(1, num_choices + 1)]
-    df = df.sort_index()
-
-    fig = px.imshow(
-        df,
-        labels=dict(x="Preference Rank", y="Option", color="Count"),
-        aspect="auto",
-        color_continuous_scale="Blues",
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=rank_counts.to_numpy(),
+            x=rank_counts.columns.tolist(),
+            y=rank_counts.index.tolist(),
+            colorscale="Blues",
+            colorbar=dict(title="Count"),
+        )
+    )
+    fig.update_layout(
+        title="Preference Distribution Heatmap",
+        xaxis_title="Preference Rank",
+        yaxis_title="Option",
+        yaxis_autorange="reversed",
     )
-    fig.update_layout(title="Preference Distribution Heatmap")
-    return fig
+    return fig.to_json()
 
 
-@st.cache_data
-def create_weighted_popularity_chart(weighted_df: pd.DataFrame) -> go.Figure:
+@st.cache_data(max_entries=8)
+def create_weighted_popularity_chart(weighted_df: pd.DataFrame) -> str:
     """Create a bar chart for weighted popularity scores."""
+    import plotly.express as px
+
     fig = px.bar(
         weighted_df.head(10),
         x="Option",
         y="Weighted Score",
         title="Top 10 Options by Weighted Popularity",
     )
-    return fig
+    return fig.to_json()
 
 
-@st.cache_data
-def create_competition_index_chart(competition_df: pd.DataFrame) -> go.Figure:
+@st.cache_data(max_entries=8)
+def create_competition_index_chart(competition_df: pd.DataFrame) -> str:
     """Create a bar chart for competition index with capacity threshold."""
+    import plotly.express as px
+
     fig = px.bar(
         competition_df.head(15),
         x="Option",
@@ -64,12 +62,14 @@ def create_competition_index_chart(competition_df: pd.DataFrame) -> go.Figure:
     fig.add_hline(
         y=1.0, line_dash="dash", line_color="red", annotation_text="Capacity threshold"
     )
-    return fig
+    return fig.to_json()
 
 
-@st.cache_data
-def create_preference_distribution_chart(dist_data: list[dict]) -> go.Figure:
+@st.cache_data(max_entries=8)
+def create_preference_distribution_chart(dist_data: list[dict]) -> str:
     """Create a bar chart showing how participants are distributed across preference ranks."""
+    import plotly.express as px
+
     dist_df = pd.DataFrame(dist_data)
     fig = px.bar(
         dist_df,
@@ -79,12 +79,14 @@ def create_preference_distribution_chart(dist_data: list[dict]) -> go.Figure:
         color="Count",
         color_continuous_scale="Greens",
     )
-    return fig
+    return fig.to_json()
 
 
-@st.cache_data
-def create_option_fill_pie_chart(fill_counts: dict[str, int]) -> go.Figure:
+@st.cache_data(max_entries=8)
+def create_option_fill_pie_chart(fill_counts: dict[str, int]) -> str:
     """Create a pie chart showing option fill rates."""
+    import plotly.express as px
+
     fill_df = pd.DataFrame(
         [{"Fill Level": k, "Count": v} for k, v in fill_counts.items() if v > 0]
     )
@@ -94,16 +96,18 @@ def create_option_fill_pie_chart(fill_counts: dict[str, int]) -> go.Figure:
         names="Fill Level",
         title="Active Option Fill Rates",
     )
-    return fig
+    return fig.to_json()
 
 
-@st.cache_data
-def create_satisfaction_histogram(scores: list[int], num_choices: int) -> go.Figure:
+@st.cache_data(max_entries=8)
+def create_satisfaction_histogram(scores: list[int], num_choices: int) -> str:
     """Create a histogram showing distribution of individual satisfaction scores."""
+    import plotly.express as px
+
     fig = px.histogram(
         x=scores,
         nbins=num_choices + 1,
         labels={"x": "Satisfaction Score", "y": "Count"},
         title="Distribution of Individual Satisfaction Scores",
     )
-    return fig
+    return fig.to_json()
@@ -1,9 +1,15 @@
 """Load student preferences from CSV files."""
 
+import warnings
+from functools import lru_cache
 from pathlib import Path
+from typing import IO
 
+import numpy as np
 import pandas as pd
 
+from src.types import PreferenceIndex
+
 
 def rank_to_score(rank: int, max_rank: int) -> int:
     """Convert a preference ranking to a score.
@@ -17,14 +23,52 @@ def rank_to_score(rank: int, max_rank: int) -> int:
     return max_rank - rank + 1
 
 
+def read_preferences_csv(source: Path | str | IO) -> pd.DataFrame:
+    """Read a preferences CSV into a DataFrame, keeping the participant column.
+
+    Args:
+        source: Path or readable file-like object of the CSV.
+
+    Returns:
+        DataFrame with the CSV's columns as-is (participants in the 1st column).
+
+    Raises:
+        ValueError: If the CSV is empty or malformed.
+    """
+    if isinstance(source, str):
+        source = Path(source)
+
+    try:
+        # Every cell is an identifier: read them as text so numeric IDs in a column with
+        # gaps stay "20" rather than becoming 20.0. The pyarrow engine infers types before
+        # applying dtype (turning gaps into "nan"), so this must stay on the C engine.
+        # index_col=False keeps participants in the first column even when rows end in a
+        # trailing comma, where pandas would otherwise make that column the row index.
+        # A row with a real extra value only raises a ParserWarning and loses that
+        # value, so the warning is escalated to an error.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", pd.errors.ParserWarning)
+            return pd.read_csv(source, engine="c", dtype=str, index_col=False)
+    except pd.errors.EmptyDataError as e:
+        raise ValueError(f"CSV file is empty: {source}") from e
+    except pd.errors.ParserError as e:
+        raise ValueError(f"Failed to parse CSV: {e}") from e
+    except pd.errors.ParserWarning as e:
+        raise ValueError(
+            f"Failed to parse CSV: a row has more fields than the header: {source}"
+        ) from e
+
+
 def load_preferences_from_csv(
-    filepath: Path | str,
+    source: Path | str | IO | pd.DataFrame,
 ) -> tuple[list[str], list[str], dict[str, list[tuple[str, int]]]]:
     """Load student preferences from a CSV file.
 
     Args:
-        filepath: Path to CSV where the 1st column is participants and
-            subsequent columns are ordered choices (any number of columns).
+        source: Path or file-like object of a CSV where the 1st column is
+            participants and subsequent columns are ordered choices (any number
+            of columns), or a DataFrame already read with read_preferences_csv.
+            Files given by path are parsed once and reused until they change.
 
     Returns:
         Tuple of (participants, options, preferences) where:
@@ -36,40 +80,109 @@ def load_preferences_from_csv(
     Raises:
         ValueError: If CSV is empty, malformed, or contains duplicate options for a participant.
     """
-    if isinstance(filepath, str):
-        filepath = Path(filepath)
+    if isinstance(source, pd.DataFrame):
+        return _parse_preferences(source, "DataFrame")
+    if not isinstance(source, (str, Path)):
+        return _parse_preferences(read_preferences_csv(source), source)
+
+    path = Path(source).resolve()
+    stat = path.stat()
+    participants, options, preferences = _load_preferences_file(
+        str(path), stat.st_mtime_ns, stat.st_size
+    )
+    # Hand out fresh containers so a caller mutating its copy cannot corrupt the cache
+    return (
+        list(participants),
+        list(options),
+        {participant: list(prefs) for participant, prefs in preferences.items()},
+    )
+
+
+# Keyed on the file's modification time and size, so an edited file is parsed anew
+@lru_cache(maxsize=4)
+def _load_preferences_file(
+    path: str, mtime_ns: int, size: int
+) -> tuple[list[str], list[str], dict[str, list[tuple[str, int]]]]:
+    """Parse a preferences CSV file, reusing the result while the file is unchanged."""
+    return _parse_preferences(read_preferences_csv(path), path)
 
-    try:
-        df = pd.read_csv(filepath, index_col=0)
-    except pd.errors.EmptyDataError as e:
-        raise ValueError(f"CSV file is empty: {filepath}") from e
-    except pd.errors.ParserError as e:
-        raise ValueError(f"Failed to parse CSV: {e}") from e
 
+def _parse_preferences(
+    df: pd.DataFrame, source: object
+) -> tuple[list[str], list[str], dict[str, list[tuple[str, int]]]]:
+    """Turn a raw preferences DataFrame into (participants, options, preferences)."""
+    if len(df.columns) > 0:
+        df = df.set_index(df.columns[0])
     if df.empty:
-        raise ValueError(f"CSV file contains no data rows: {filepath}")
+        raise ValueError(f"CSV file contains no data rows: {source}")
 
     participants = df.index.tolist()
-    options = sorted({val for val in df.values.flatten() if pd.notna(val)})
     num_choices = len(df.columns)
 
-    preferences = {}
-    for row in df.itertuples():
-        prefs = [
-            (option, rank_to_score(rank, num_choices))
-            for rank, option in enumerate(row[1:], start=1)
-            if pd.notna(option)
-        ]
-
-        # Check for duplicate options
-        seen: set[str] = set()
-        for option, _ in prefs:
-            if option in seen:
-                raise ValueError(
-                    f"Duplicate option '{option}' for participant '{row.Index}'"
-                )
-            seen.add(option)
-
-        preferences[row.Index] = prefs
+    # Work on the raw choice matrix instead of boxing every row as a Series
+    choice_arr = df.to_numpy(dtype=object)
+    mask = pd.notna(choice_arr)
+    scores = rank_to_score(np.arange(1, num_choices + 1), num_choices)
+
+    # Row-major order, so each participant's preferences are a contiguous run of cells
+    rows, cols = np.nonzero(mask)
+    values = choice_arr[rows, cols]
+    # Hash-based factorize is far cheaper than np.unique's sort of Python strings
+    option_codes, unique_options = pd.factorize(values, sort=True)
+    options = unique_options.tolist()
+
+    # A (participant, option) pair seen twice is a duplicate; locate the first one in C
+    pair_ids = pd.Index(rows * len(options) + option_codes)
+    if pair_ids.has_duplicates:
+        first = int(np.argmax(pair_ids.duplicated()))
+        raise ValueError(
+            f"Duplicate option '{options[option_codes[first]]}' "
+            f"for participant '{participants[rows[first]]}'"
+        )
+
+    cells = list(zip(values.tolist(), scores[cols].tolist()))
+    ends = np.cumsum(mask.sum(axis=1)).tolist()
+    starts = [0, *ends[:-1]]
+    preferences = {
+        participant: cells[start:end] for participant, start, end in zip(participants, starts, ends)
+    }
 
     return participants, options, preferences
+
+
+def build_preference_index(
+    participants: list[str],
+    options: list[str],
+    preferences: dict[str, list[tuple[str, int]]],
+) -> PreferenceIndex:
+    """Pack preferences into integer-coded arrays for vectorized analytics.
+
+    Args:
+        participants: Participant IDs; row order of the resulting arrays.
+        options: Option IDs; option codes index into this list.
+        preferences: Dict mapping participant_id -> [(option, score), ...].
+
+    Returns:
+        PreferenceIndex with (len(participants), max preferences) code and score arrays.
+    """
+    participant_prefs = [preferences.get(participant, []) for participant in participants]
+    lengths = np.array([len(prefs) for prefs in participant_prefs], dtype=np.intp)
+    width = int(lengths.max(initial=0))
+
+    # Scatter the flattened preference cells into their (row, col) positions
+    rows = np.repeat(np.arange(len(participants)), lengths)
+    cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    flat_options = [option for prefs in participant_prefs for option, _ in prefs]
+    flat_scores = [score for prefs in participant_prefs for _, score in prefs]
+
+    option_codes = np.full((len(participants), width), -1, dtype=np.int32)
+    scores = np.zeros((len(participants), width), dtype=np.int16)
+    option_codes[rows, cols] = pd.Index(options).get_indexer(flat_options)
+    scores[rows, cols] = flat_scores
+
+    return PreferenceIndex(
+        participants=participants,
+        options=options,
+        option_codes=option_codes,
+        scores=scores,
+    )
@@ -9,12 +9,44 @@ import typer
 from src.data_loader import load_preferences_from_csv
 from src.output import export_results_to_csv, print_assignment_summary
 from src.solver import solve_assignment
+from src.types import SolverResult
 
 app = typer.Typer(
     help="Optimize participant-to-option assignments based on preferences"
 )
 
 
+def run_pipeline(
+    csv_file: Path,
+    min_quota: int = 2,
+    max_quota: int = 3,
+    option_weight: float = 1.0,
+    seed: int | None = None,
+) -> SolverResult:
+    """Load a preferences CSV and solve it; the CLI without argument parsing or printing.
+
+    Args:
+        csv_file: Path to the preferences CSV.
+        min_quota: Minimum participants per active option.
+        max_quota: Maximum participants per option.
+        option_weight: Weight for option utilization.
+        seed: Seed for shuffling participant order, or None to keep file order.
+
+    Returns:
+        SolverResult for the file's preferences.
+    """
+    participants, options, preferences = load_preferences_from_csv(csv_file)
+    return solve_assignment(
+        participants,
+        options,
+        preferences,
+        min_quota=min_quota,
+        max_quota=max_quota,
+        option_weight=option_weight,
+        seed=seed,
+    )
+
+
 @app.command()
 def main(
     csv_file: Annotated[
@@ -67,23 +99,11 @@ def main(
         )
         raise typer.Exit(1)
 
-    participants, options, preferences = load_preferences_from_csv(csv_file)
-
-    # Shuffle participant order if requested (affects tie-breaking)
-    if seed is not None or shuffle:
-        if seed is not None:
-            random.seed(seed)
-        participants = participants.copy()  # Avoid modifying original list in-place
-        random.shuffle(participants)
+    # Shuffle without --seed uses a fresh random seed, so runs are not reproducible
+    if shuffle and seed is None:
+        seed = random.randrange(2**32)
 
-    result = solve_assignment(
-        participants,
-        options,
-        preferences,
-        min_quota=min_quota,
-        max_quota=max_quota,
-        option_weight=option_weight,
-    )
+    result = run_pipeline(csv_file, min_quota, max_quota, option_weight, seed)
 
     print_assignment_summary(result)
 
@@ -18,7 +18,11 @@ def print_assignment_summary(result: SolverResult) -> None:
         print(f"Objective Value: {m.objective_value:.2f}")
 
         print("\nPreference Distribution:")
-        for rank, count in sorted(m.preference_distribution.items(), key=lambda x: str(x[0])):
+        # Numeric ranks in numeric order (10 after 9), then the "unassigned"-style labels
+        distribution = sorted(
+            m.preference_distribution.items(), key=lambda x: (isinstance(x[0], str), x[0])
+        )
+        for rank, count in distribution:
             if count > 0:
                 print(f"  {rank}: {count}")
 
@@ -36,18 +40,17 @@ def print_assignment_summary(result: SolverResult) -> None:
 def export_results_to_csv(result: SolverResult, filepath: Path | str) -> None:
     """Export participant assignments to CSV."""
     try:
-        with open(filepath, "w", newline="") as f:
+        # A 1 MiB buffer keeps large exports to a handful of writes
+        with open(filepath, "w", newline="", buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow(
                 ["participant_id", "assigned_option", "preference_rank", "preference_score", "status"]
             )
-            for participant, assignment in sorted(result.participant_assignments.items()):
-                writer.writerow([
-                    participant,
-                    assignment.option,
-                    assignment.preference_rank or "",
-                    assignment.preference_score,
-                    assignment.status.value,
-                ])
+            writer.writerows(
+                (participant, option, rank or "", score, status.value)
+                for participant, (option, status, rank, score) in sorted(
+                    result.participant_assignments.items()
+                )
+            )
     except OSError as e:
         raise OSError(f"Failed to write results to '{filepath}': {e}") from e
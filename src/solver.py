@@ -1,9 +1,23 @@
 """Solver module for preference assignment optimization using ILP."""
 
+import random
 from collections import defaultdict
-
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum, value
+from collections.abc import Mapping, Sequence
+
+from pulp import (
+    PULP_CBC_CMD,
+    LpAffineExpression,
+    LpConstraint,
+    LpMaximize,
+    LpProblem,
+    LpVariable,
+    value,
+)
 from pulp.constants import (
+    LpConstraintEQ,
+    LpConstraintGE,
+    LpConstraintLE,
+    LpSolutionIntegerFeasible,
     LpStatusInfeasible,
     LpStatusNotSolved,
     LpStatusOptimal,
@@ -19,14 +33,6 @@ from src.types import (
 )
 
 
-def _find_preference_rank(prefs: list[tuple[str, int]], option: str) -> int | None:
-    """Find the 1-based rank of an option in a participant's preference list."""
-    for idx, (pref_option, _) in enumerate(prefs):
-        if pref_option == option:
-            return idx + 1
-    return None
-
-
 class PreferenceAssignmentSolver:
     """
     ILP-based solver for preference assignment optimization.
@@ -37,20 +43,26 @@ class PreferenceAssignmentSolver:
     Attributes:
         participants: List of participant IDs
         options: List of option IDs
-        preferences: Dictionary mapping participants to their option preferences with scores
+        preferences: Mapping of participants to their option preferences with scores
         min_quota: Minimum participants per active option
         max_quota: Maximum participants per option
         option_weight: Weight for the option utilization objective
+        seed: Seed used to shuffle participant order, or None to keep it
+        time_limit: CBC wall-clock limit in seconds, or None for no limit
+        gap_rel: Relative MIP gap at which CBC may stop, or None to prove optimality
     """
 
     def __init__(
         self,
         participants: list[str],
         options: list[str],
-        preferences: dict[str, list[tuple[str, int]]],
+        preferences: Mapping[str, Sequence[tuple[str, int]]],
         min_quota: int = 2,
         max_quota: int = 3,
         option_weight: float = 1.0,
+        seed: int | None = None,
+        time_limit: float | None = None,
+        gap_rel: float | None = None,
     ):
         """
         Initialize the solver with problem data.
@@ -58,11 +70,18 @@ class PreferenceAssignmentSolver:
         Parameters:
             participants: List of participant IDs
             options: List of option IDs
-            preferences: Dictionary mapping participants to their option preferences with scores
+            preferences: Mapping of participants to their option preferences with scores
                          e.g., {'Participant1': [('OptionA', 5), ('OptionB', 4), ...]}
             min_quota: Minimum participants per active option (default: 2)
             max_quota: Maximum participants per option (default: 3)
             option_weight: Weight for the option utilization objective (default: 1.0)
+            seed: If set, shuffle participant order with this seed, which affects
+                  tie-breaking between equally good solutions (default: None)
+            time_limit: Stop CBC after this many seconds; the best solution found so
+                        far is returned with status FEASIBLE if it was not proven
+                        optimal (default: None)
+            gap_rel: Let CBC stop once the solution is within this relative gap of the
+                     bound, e.g. 1e-4 (default: None, solve to proven optimality)
 
         Raises:
             ValueError: If min_quota < 1 or max_quota < min_quota
@@ -72,13 +91,25 @@ class PreferenceAssignmentSolver:
         if max_quota < min_quota:
             raise ValueError("max_quota must be >= min_quota")
 
+        # Shuffle participant order if requested (affects tie-breaking)
+        if seed is not None:
+            # random.Random accepts any int seed, negative ones included
+            participants = list(participants)
+            random.Random(seed).shuffle(participants)
+
         self.participants = participants
+        self.seed = seed
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
         self.options = options
         self.preferences = preferences
         self.min_quota = min_quota
         self.max_quota = max_quota
         self.option_weight = option_weight
 
+        # Each participant's preferences in participant order, looked up once for all passes
+        self._participant_prefs = [preferences.get(p, ()) for p in participants]
+
         # Pre-compute option -> participants mapping
         self._option_to_participants = self._build_option_index()
 
@@ -87,91 +118,154 @@ class PreferenceAssignmentSolver:
         self._x: dict[tuple[str, str], LpVariable] = {}
         self._y: dict[str, LpVariable] = {}
 
-    def _build_option_index(self) -> dict[str, set[str]]:
+    def _build_option_index(self) -> dict[str, list[str]]:
         """Pre-compute inverted index: option -> participants who have it in preferences."""
-        option_to_participants: dict[str, set[str]] = defaultdict(set)
+        # Lists, not sets: the values are only iterated, each participant lists an option
+        # at most once, and list order does not vary with string hash randomization
+        option_to_participants: dict[str, list[str]] = defaultdict(list)
         for participant, prefs in self.preferences.items():
             for option, _ in prefs:
-                option_to_participants[option].add(participant)
+                option_to_participants[option].append(participant)
         return option_to_participants
 
     def _build_model(self) -> None:
         """Build the ILP model with decision variables and objective function."""
         self._model = LpProblem("Preference-Assignment", LpMaximize)
 
-        # Decision variables for participant-option assignments
+        # Variables are named by position, not ID: names stay short, and IDs such as
+        # ("a_b", "c") and ("a", "b_c") cannot both map to "x_a_b_c"
+        option_ids = {option: j for j, option in enumerate(self.options)}
+
+        # Presolve: an option wanted by fewer than min_quota participants can never be
+        # active, so it gets no variables or quota rows at all (fixed at zero)
+        viable = {
+            option
+            for option in self.options
+            if len(self._option_to_participants.get(option, ())) >= self.min_quota
+        }
+
+        # Decision variables for participant-option assignments, collecting their
+        # preference-score objective terms in the same pass
         self._x = {}
-        for participant in self.participants:
-            for option, _ in self.preferences.get(participant, []):
-                self._x[participant, option] = LpVariable(
-                    f"x_{participant}_{option}", cat="Binary"
-                )
+        preference_terms: list[tuple[LpVariable, float]] = []
+        for i, (participant, participant_prefs) in enumerate(
+            zip(self.participants, self._participant_prefs)
+        ):
+            for option, score in participant_prefs:
+                if option not in viable:
+                    continue
+                x = LpVariable(f"x_{i}_{option_ids[option]}", cat="Binary")
+                self._x[participant, option] = x
+                preference_terms.append((x, score))
 
         # Decision variables for option usage
         self._y = {
-            option: LpVariable(f"y_{option}", cat="Binary") for option in self.options
+            option: LpVariable(f"y_{j}", cat="Binary")
+            for option, j in option_ids.items()
+            if option in viable
         }
 
         # Objective function:
         # 1. Maximize preference score
         # 2. Maximize number of options used (with weight)
-        preference_sum = lpSum(
-            self._x[participant, option] * score
-            for participant in self.participants
-            for option, score in self.preferences.get(participant, [])
+        # Built from (variable, coefficient) lists in one go; lpSum would merge a
+        # temporary expression per term
+        objective = LpAffineExpression(
+            preference_terms + [(y, self.option_weight) for y in self._y.values()]
         )
-        option_utilization = lpSum(self._y[option] for option in self.options)
-        self._model += preference_sum + self.option_weight * option_utilization
+        self._model.setObjective(objective)
+
+    def _is_trivially_infeasible(self) -> bool:
+        """Check the necessary conditions for feasibility that need no solver.
+
+        Every participant with preferences must be assigned, so each needs at least
+        one option kept by presolve, and together they must fit in those options at
+        max_quota each. Must be called after _build_model.
+        """
+        demand = 0
+        for participant, participant_prefs in zip(self.participants, self._participant_prefs):
+            if not participant_prefs:
+                continue
+            demand += 1
+            if not any((participant, option) in self._x for option, _ in participant_prefs):
+                return True
+        return demand > len(self._y) * self.max_quota
 
     def _add_constraints(self) -> None:
         """Add all constraints to the model."""
         if self._model is None:
             raise RuntimeError("Model must be built before adding constraints")
 
-        # Constraint: Each participant with preferences is assigned to exactly one option
-        for participant in self.participants:
-            participant_prefs = self.preferences.get(participant, [])
+        # Constraints are named by position: addConstraint then skips the search for an
+        # unused generated name, and IDs with characters PuLP rewrites cannot collide
+        add = self._model.addConstraint
+
+        # Constraint: Each participant with preferences is assigned to exactly one option.
+        # If none of their options is viable the row is empty, which makes the model
+        # infeasible exactly as the full formulation would be (solve() normally catches
+        # this case first, in _is_trivially_infeasible).
+        x = self._x
+        for i, (participant, participant_prefs) in enumerate(
+            zip(self.participants, self._participant_prefs)
+        ):
             if participant_prefs:
-                constraint = (
-                    lpSum(
-                        self._x[participant, option] for option, _ in participant_prefs
-                    )
-                    == 1
+                assigned = LpAffineExpression(
+                    [
+                        (x[participant, option], 1)
+                        for option, _ in participant_prefs
+                        if (participant, option) in x
+                    ]
                 )
-                self._model += constraint  # type: ignore[assignment]
+                add(LpConstraint(assigned, LpConstraintEQ, name=f"assign_{i}", rhs=1))
 
         # Big-M formulation: if y[option]=0 (inactive), count=0; if y[option]=1, count in [min_quota, max_quota]
-        for option in self.options:
-            participants_with_option = self._option_to_participants.get(option, set())
-
-            if not participants_with_option:
+        for j, option in enumerate(self.options):
+            # Only options kept by presolve have a y variable
+            if option not in self._y:
                 continue
+            participants_with_option = self._option_to_participants[option]
 
-            option_count = lpSum(
-                self._x[participant, option] for participant in participants_with_option
-            )
+            option_terms = [
+                (self._x[participant, option], 1) for participant in participants_with_option
+            ]
+            y = self._y[option]
 
             # If active (y=1), at least min_quota participants; if inactive (y=0), must be 0
-            self._model += option_count >= self.min_quota * self._y[option]
-            self._model += option_count <= self.max_quota * self._y[option]
+            add(
+                LpConstraint(
+                    LpAffineExpression([*option_terms, (y, -self.min_quota)]),
+                    LpConstraintGE,
+                    name=f"min_quota_{j}",
+                    rhs=0,
+                )
+            )
+            add(
+                LpConstraint(
+                    LpAffineExpression([*option_terms, (y, -self.max_quota)]),
+                    LpConstraintLE,
+                    name=f"max_quota_{j}",
+                    rhs=0,
+                )
+            )
 
     def _process_assignments(
         self,
-    ) -> tuple[dict[str, list[str]], dict[str, ParticipantAssignment]]:
+    ) -> tuple[dict[str, tuple[str, ...]], dict[str, ParticipantAssignment]]:
         """
         Extract assignments from the solved model.
 
         Returns:
-            Tuple of (option_assignments, participant_assignments)
+            Tuple of (option_assignments, participant_assignments); each option's
+            participants are frozen into a tuple once collected
         """
         option_assignments: dict[str, list[str]] = {
             option: [] for option in self.options
         }
         participant_assignments: dict[str, ParticipantAssignment] = {}
 
-        for participant in self.participants:
-            participant_prefs = self.preferences.get(participant, [])
-
+        # Probing each participant's preferences in rank order stops at the chosen one,
+        # which is usually a top choice; sweeping every variable would read all of them
+        for participant, participant_prefs in zip(self.participants, self._participant_prefs):
             if not participant_prefs:
                 participant_assignments[participant] = ParticipantAssignment(
                     option="",
@@ -182,21 +276,14 @@ class PreferenceAssignmentSolver:
                 continue
 
             assigned = False
-            for option, score in participant_prefs:
-                var_value = (
-                    value(self._x[participant, option])
-                    if (participant, option) in self._x
-                    else 0.0
-                )
-                # value() returns either float or None
-                if (
-                    var_value is not None
-                    and isinstance(var_value, (int, float))
-                    and round(var_value) == 1
-                ):
+            for rank, (option, score) in enumerate(participant_prefs, 1):
+                # Read the solver's value off the variable; value() would re-dispatch on
+                # its argument type for every pair. It is None if CBC did not report it.
+                # Options removed by presolve have no variable and are never chosen
+                x = self._x.get((participant, option))
+                var_value = x.varValue if x is not None else None
+                if var_value is not None and round(var_value) == 1:
                     option_assignments[option].append(participant)
-                    rank = _find_preference_rank(participant_prefs, option)
-
                     participant_assignments[participant] = ParticipantAssignment(
                         option=option,
                         status=AssignmentStatus.ASSIGNED,
@@ -214,47 +301,40 @@ class PreferenceAssignmentSolver:
                     preference_score=0,
                 )
 
-        return option_assignments, participant_assignments
+        frozen = {option: tuple(assigned) for option, assigned in option_assignments.items()}
+        return frozen, participant_assignments
 
     def _calculate_metrics(
         self,
-        option_assignments: dict[str, list[str]],
+        option_assignments: dict[str, tuple[str, ...]],
         participant_assignments: dict[str, ParticipantAssignment],
         objective_value: float,
     ) -> Metrics:
         """Calculate metrics from the solved assignments."""
-        # Calculate preference satisfaction
-        preference_satisfaction = sum(
-            assignment.preference_score
-            for assignment in participant_assignments.values()
-        )
-
-        # Count active options
-        option_counts = {
-            option: len(assigned) for option, assigned in option_assignments.items()
-        }
-        active_options = sum(1 for count in option_counts.values() if count > 0)
-
-        # Calculate preference distribution (dynamic, supports any number of choices)
+        # One pass over the participants gathers satisfaction and the rank distribution
+        # (dynamic, supports any number of choices)
+        preference_satisfaction = 0
         preference_distribution: dict[int | str, int] = defaultdict(int)
-
-        for assignment in participant_assignments.values():
-            if assignment.status == AssignmentStatus.UNASSIGNED:
+        for _, status, rank, score in participant_assignments.values():
+            preference_satisfaction += score
+            if status is AssignmentStatus.UNASSIGNED:
                 preference_distribution["unassigned"] += 1
-            elif assignment.status == AssignmentStatus.NO_PREFERENCES:
+            elif status is AssignmentStatus.NO_PREFERENCES:
                 preference_distribution["no_preferences"] += 1
-            elif assignment.preference_rank is not None:
-                preference_distribution[assignment.preference_rank] += 1
-
-        # Find unused options
-        unused_options = [
-            option for option, count in option_counts.items() if count == 0
-        ]
+            elif rank is not None:
+                preference_distribution[rank] += 1
 
-        # Check for constraint violations
+        # One pass over the options gathers active and unused options and quota violations
+        active_options = 0
+        unused_options = []
         constraint_violations = []
-        for option, count in option_counts.items():
-            if count > 0 and (count < self.min_quota or count > self.max_quota):
+        for option, assigned in option_assignments.items():
+            count = len(assigned)
+            if count == 0:
+                unused_options.append(option)
+                continue
+            active_options += 1
+            if count < self.min_quota or count > self.max_quota:
                 constraint_violations.append(
                     f"Option {option} has {count} participants, "
                     f"but should have 0 or {self.min_quota}-{self.max_quota}"
@@ -270,8 +350,8 @@ class PreferenceAssignmentSolver:
             ),
             objective_value=objective_value,
             preference_distribution=preference_distribution,
-            unused_options=unused_options,
-            constraint_violations=constraint_violations,
+            unused_options=frozenset(unused_options),
+            constraint_violations=tuple(constraint_violations),
         )
 
     def solve(self) -> SolverResult:
@@ -292,33 +372,45 @@ class PreferenceAssignmentSolver:
         # Build model with variables and objective
         self._build_model()
 
-        # Add constraints
-        self._add_constraints()
+        if self._is_trivially_infeasible():
+            # Counting alone proves there is no solution; skip building rows and CBC
+            solver_status = SolverStatus.INFEASIBLE
+        else:
+            # Add constraints
+            self._add_constraints()
 
-        # Solve
-        if self._model is None:
-            raise RuntimeError("Model was not built")
+            # Solve
+            if self._model is None:
+                raise RuntimeError("Model was not built")
 
-        status_code = self._model.solve()
+            # msg=False keeps CBC's log off stdout, where it buried the CLI summary
+            status_code = self._model.solve(
+                PULP_CBC_CMD(msg=False, timeLimit=self.time_limit, gapRel=self.gap_rel)
+            )
 
-        # Map PuLP status codes to SolverStatus
-        status_map = {
-            LpStatusOptimal: SolverStatus.OPTIMAL,
-            LpStatusInfeasible: SolverStatus.INFEASIBLE,
-            LpStatusUnbounded: SolverStatus.UNBOUNDED,
-            LpStatusNotSolved: SolverStatus.NOT_SOLVED,
-        }
-        solver_status = status_map.get(status_code, SolverStatus.NOT_SOLVED)
+            # Map PuLP status codes to SolverStatus
+            status_map = {
+                LpStatusOptimal: SolverStatus.OPTIMAL,
+                LpStatusInfeasible: SolverStatus.INFEASIBLE,
+                LpStatusUnbounded: SolverStatus.UNBOUNDED,
+                LpStatusNotSolved: SolverStatus.NOT_SOLVED,
+            }
+            solver_status = status_map.get(status_code, SolverStatus.NOT_SOLVED)
+            # CBC stopped by timeLimit with an incumbent still reports LpStatusOptimal;
+            # only the solution status says that incumbent was never proven optimal
+            if (
+                solver_status == SolverStatus.OPTIMAL
+                and self._model.sol_status == LpSolutionIntegerFeasible
+            ):
+                solver_status = SolverStatus.FEASIBLE
 
         # Initialize result structure
-        option_assignments: dict[str, list[str]] = {
-            option: [] for option in self.options
-        }
+        option_assignments: dict[str, tuple[str, ...]] = {option: () for option in self.options}
         participant_assignments: dict[str, ParticipantAssignment] = {}
         option_counts: dict[str, int] = {option: 0 for option in self.options}
         metrics: Metrics | None = None
 
-        if solver_status == SolverStatus.OPTIMAL:
+        if solver_status in (SolverStatus.OPTIMAL, SolverStatus.FEASIBLE):
             # Process assignments
             option_assignments, participant_assignments = self._process_assignments()
 
@@ -353,10 +445,13 @@ class PreferenceAssignmentSolver:
 def solve_assignment(
     participants: list[str],
     options: list[str],
-    preferences: dict[str, list[tuple[str, int]]],
+    preferences: Mapping[str, Sequence[tuple[str, int]]],
     min_quota: int,
     max_quota: int,
     option_weight: float,
+    seed: int | None = None,
+    time_limit: float | None = None,
+    gap_rel: float | None = None,
 ) -> SolverResult:
     """
     Solve the preference assignment problem using integer programming.
@@ -366,12 +461,16 @@ def solve_assignment(
     Parameters:
         participants: List of participant IDs
         options: List of option IDs
-        preferences: Dictionary mapping participants to their option preferences with scores
+        preferences: Mapping of participants to their option preferences with scores
                      e.g., {'Participant1': [('OptionA', 5), ('OptionB', 4), ...]}
         min_quota: Minimum participants per active option
         max_quota: Maximum participants per option
         option_weight: Weight for the option utilization objective.
                        Higher values prioritize using more options
+        seed: If set, shuffle participant order with this seed (affects tie-breaking)
+        time_limit: If set, stop CBC after this many seconds with its best solution,
+                    reported as FEASIBLE unless CBC proved it optimal
+        gap_rel: If set, relative MIP gap at which CBC may stop early
 
     Option constraints:
         - Each option must have either 0 participants OR between min_quota and max_quota
@@ -391,5 +490,8 @@ def solve_assignment(
         min_quota=min_quota,
         max_quota=max_quota,
         option_weight=option_weight,
+        seed=seed,
+        time_limit=time_limit,
+        gap_rel=gap_rel,
     )
     return solver.solve()
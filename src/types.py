@@ -1,13 +1,17 @@
 """Type definitions for the preference assignment optimizer."""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
+from typing import NamedTuple
+
+import numpy as np
 
 
 class SolverStatus(Enum):
     """Status of the solver result."""
 
     OPTIMAL = "Optimal"
+    FEASIBLE = "Feasible"  # stopped at the time limit with a solution not proven optimal
     INFEASIBLE = "Infeasible"
     UNBOUNDED = "Unbounded"
     NOT_SOLVED = "Not Solved"
@@ -21,9 +25,12 @@ class AssignmentStatus(Enum):
     NO_PREFERENCES = "NO_PREFERENCES"
 
 
-@dataclass
-class ParticipantAssignment:
-    """Assignment result for a single participant."""
+class ParticipantAssignment(NamedTuple):
+    """Assignment result for a single participant.
+
+    A NamedTuple rather than a dataclass: the solver builds one per participant,
+    and tuple construction is the cheapest immutable record CPython offers.
+    """
 
     option: str
     status: AssignmentStatus
@@ -31,7 +38,7 @@ class ParticipantAssignment:
     preference_score: int = 0
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, kw_only=True)
 class Metrics:
     """Metrics for solver results."""
 
@@ -40,18 +47,30 @@ class Metrics:
     average_satisfaction: float
     objective_value: float
     preference_distribution: dict[int | str, int]
-    unused_options: list[str]
-    constraint_violations: list[str] = field(default_factory=list)
+    unused_options: frozenset[str] = frozenset()
+    constraint_violations: tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class SolverResult:
     """Complete result from the solver."""
 
     status: SolverStatus
-    assignments: dict[str, list[str]]  # option -> [participants]
+    assignments: dict[str, tuple[str, ...]]  # option -> (participants...)
     option_counts: dict[str, int]
     participant_assignments: dict[str, ParticipantAssignment]
     metrics: Metrics | None = None
 
 
+@dataclass(slots=True, match_args=False)
+class PreferenceIndex:
+    """Preferences packed as parallel arrays, one row per participant.
+
+    Column ``j`` of a row holds the participant's ``j``-th listed preference;
+    unused cells have an option code of -1.
+    """
+
+    participants: list[str]
+    options: list[str]
+    option_codes: np.ndarray  # (participants, choices) int32 index into options
+    scores: np.ndarray  # (participants, choices) int16 preference scores
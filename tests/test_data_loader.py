@@ -3,32 +3,44 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
-from src.data_loader import load_preferences_from_csv, rank_to_score
+from src.data_loader import build_preference_index, load_preferences_from_csv, rank_to_score
 
+MOCK_PATH = Path(__file__).parent.parent / "data" / "mock_preferences.csv"
+EXPECTED_STUDENTS = tuple(f"student_{i:03d}" for i in range(1, 46))
+EXPECTED_CHOICES = tuple(f"choice_{i}" for i in range(1, 6))
+
+
+@pytest.fixture(scope="session")
+def mock_df() -> pd.DataFrame:
+    """The mock preferences file, parsed once for the whole run."""
+    if not MOCK_PATH.exists():
+        pytest.skip("Mock data file not found")
+    # pyarrow is not a declared dependency; it normally arrives with streamlit
+    pytest.importorskip("pyarrow")
+    return pd.read_csv(MOCK_PATH, index_col=0, engine="pyarrow")
 
-class TestMockDataFile:
-    MOCK_PATH = Path(__file__).parent.parent / "data" / "mock_preferences.csv"
 
+class TestMockDataFile:
     def test_mock_preferences_file_exists(self):
-        if not self.MOCK_PATH.exists():
+        if not MOCK_PATH.exists():
             pytest.skip("Mock data file not found")
 
-    def test_mock_preferences_integrity(self):
-        df = pd.read_csv(self.MOCK_PATH, index_col=0)
+    def test_mock_preferences_integrity(self, mock_df: pd.DataFrame):
+        df = mock_df
         assert df.shape == (
             45,
             5,
         ), "Mock data should have 45 students and 5 choices each"
 
         assert df.index.is_unique, "Student IDs should be unique"
-        assert df.index.tolist() == [
-            f"student_{i:03d}" for i in range(1, 46)
-        ], "Student IDs should be student_001 to student_045"
+        assert df.index.tolist() == list(
+            EXPECTED_STUDENTS
+        ), "Student IDs should be student_001 to student_045"
 
         assert df.columns.is_unique, "Choice columns should be unique"
-        assert df.columns.tolist() == [
-            f"choice_{i}" for i in range(1, 6)
-        ], "Columns should be choice_1 to choice_5"
+        assert df.columns.tolist() == list(
+            EXPECTED_CHOICES
+        ), "Columns should be choice_1 to choice_5"
 
         assert df.notna().all().all(), "Mock data should not contain missing values"
 
@@ -89,6 +101,17 @@ student_003,Project_A,Project_C,Project_B,Project_E,Project_D
         for student_id, prefs in preferences.items():
             assert len(prefs) == 5, f"{student_id} should have 5 preferences"
 
+    def test_repeat_load_unaffected_by_caller_mutation(self, sample_csv: Path):
+        _, _, preferences = load_preferences_from_csv(sample_csv)
+        preferences["student_001"].clear()
+        _, _, reloaded = load_preferences_from_csv(sample_csv)
+        assert len(reloaded["student_001"]) == 5
+
+    def test_reloads_after_file_changes(self, sample_csv: Path):
+        load_preferences_from_csv(sample_csv)
+        sample_csv.write_text("student_id,choice_1\nstudent_009,Project_A\n")
+        assert load_preferences_from_csv(sample_csv)[0] == ["student_009"]
+
 
 class TestMissingValues:
     @pytest.fixture
@@ -113,6 +136,14 @@ student_002,Project_B,Project_A,,,
         assert "" not in projects
         assert None not in projects
 
+    def test_numeric_ids_read_as_strings(self, tmp_path: Path):
+        csv_path = tmp_path / "numeric_prefs.csv"
+        csv_path.write_text("student_id,choice_1,choice_2\n1,10,20\n2,20,\n")
+        students, projects, preferences = load_preferences_from_csv(csv_path)
+        assert students == ["1", "2"]
+        assert projects == ["10", "20"]
+        assert preferences["1"] == [("10", 2), ("20", 1)]
+
 
 class TestDuplicateOptions:
     def test_duplicate_option_raises_error(self, tmp_path: Path):
@@ -157,3 +188,36 @@ student_001,A,B,C
         students, options, preferences = load_preferences_from_csv(csv_path)
         # With 3 choices: 1st=3, 2nd=2, 3rd=1
         assert preferences["student_001"] == [("A", 3), ("B", 2), ("C", 1)]
+
+    def test_trailing_commas_keep_participant_column(self, tmp_path: Path):
+        """Rows ending in a trailing comma must not shift the participant column."""
+        csv_path = tmp_path / "trailing_commas.csv"
+        csv_path.write_text("student_id,c1,c2\ns1,A,B,\ns2,B,A,\n")
+
+        students, options, preferences = load_preferences_from_csv(csv_path)
+        assert students == ["s1", "s2"]
+        assert options == ["A", "B"]
+        assert preferences["s1"] == [("A", 2), ("B", 1)]
+
+    def test_extra_field_raises_error(self, tmp_path: Path):
+        """A row with more values than the header must fail rather than drop a choice."""
+        csv_path = tmp_path / "extra_field.csv"
+        csv_path.write_text("student_id,c1,c2\ns1,A,B,C\n")
+
+        with pytest.raises(ValueError, match="more fields than the header"):
+            load_preferences_from_csv(csv_path)
+
+
+class TestBuildPreferenceIndex:
+    def test_packs_codes_and_scores(self):
+        index = build_preference_index(
+            ["p1", "p2", "p3"],
+            ["A", "B", "C"],
+            {"p1": [("B", 3), ("A", 2), ("C", 1)], "p2": [("C", 3)]},
+        )
+        assert index.option_codes.tolist() == [[1, 0, 2], [2, -1, -1], [-1, -1, -1]]
+        assert index.scores.tolist() == [[3, 2, 1], [3, 0, 0], [0, 0, 0]]
+
+    def test_empty_preferences(self):
+        index = build_preference_index(["p1"], ["A"], {})
+        assert index.option_codes.shape == (1, 0)
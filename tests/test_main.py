@@ -2,16 +2,61 @@
 
 import csv
 import tempfile
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
 from typer.testing import CliRunner
 
-from src.main import app
+from src.main import app, main, run_pipeline
 from src.output import export_results_to_csv, print_assignment_summary
 from src.types import AssignmentStatus, Metrics, ParticipantAssignment, SolverResult, SolverStatus
 
 runner = CliRunner()
+MOCK_CSV = Path("data/mock_preferences.csv")
+
+
+@pytest.fixture(scope="module")
+def base_result() -> SolverResult:
+    """The default pipeline on the mock data, solved once for the module."""
+    return run_pipeline(MOCK_CSV)
+
+
+@pytest.fixture
+def summary_result() -> SolverResult:
+    """A small optimal result; tests derive their variants with dataclasses.replace."""
+    return SolverResult(
+        status=SolverStatus.OPTIMAL,
+        assignments={"OptionA": ("P1", "P2"), "OptionB": ("P3",)},
+        option_counts={"OptionA": 2, "OptionB": 1},
+        participant_assignments={
+            "P1": ParticipantAssignment(
+                option="OptionA",
+                status=AssignmentStatus.ASSIGNED,
+                preference_rank=1,
+                preference_score=5,
+            ),
+            "P2": ParticipantAssignment(
+                option="OptionA",
+                status=AssignmentStatus.ASSIGNED,
+                preference_rank=2,
+                preference_score=4,
+            ),
+            "P3": ParticipantAssignment(
+                option="OptionB",
+                status=AssignmentStatus.ASSIGNED,
+                preference_rank=1,
+                preference_score=5,
+            ),
+        },
+        metrics=Metrics(
+            preference_satisfaction=14,
+            active_options=2,
+            average_satisfaction=4.67,
+            objective_value=16.0,
+            preference_distribution={1: 2, 2: 1, 3: 0, 4: 0, 5: 0, "unassigned": 0},
+        ),
+    )
 
 
 class TestCLI:
@@ -23,17 +68,15 @@ class TestCLI:
         assert result.exit_code == 0
         assert "Solver Status: Optimal" in result.output
 
-    def test_cli_with_option_weight(self):
+    def test_cli_with_option_weight(self, capsys):
         """Test CLI with option weight parameter."""
-        result = runner.invoke(app, ["data/mock_preferences.csv", "-w", "0.5"])
-        assert result.exit_code == 0
-        assert "Solver Status: Optimal" in result.output
+        main(MOCK_CSV, option_weight=0.5)
+        assert "Solver Status: Optimal" in capsys.readouterr().out
 
-    def test_cli_with_quotas(self):
+    def test_cli_with_quotas(self, capsys):
         """Test CLI with custom quota parameters."""
-        result = runner.invoke(app, ["data/mock_preferences.csv", "-m", "1", "-q", "5"])
-        assert result.exit_code == 0
-        assert "Solver Status: Optimal" in result.output
+        main(MOCK_CSV, min_quota=1, max_quota=5)
+        assert "Solver Status: Optimal" in capsys.readouterr().out
 
     def test_cli_with_seed(self):
         """Test CLI with seed parameter for reproducibility."""
@@ -44,12 +87,17 @@ class TestCLI:
         # With same seed, output should be identical
         assert result1.output == result2.output
 
-    def test_cli_with_shuffle(self):
-        """Test CLI with shuffle flag."""
-        result = runner.invoke(app, ["data/mock_preferences.csv", "--shuffle"])
+    def test_cli_with_negative_seed(self):
+        """Any integer seed works, negative ones included."""
+        result = runner.invoke(app, ["data/mock_preferences.csv", "-s", "-3"])
         assert result.exit_code == 0
         assert "Solver Status: Optimal" in result.output
 
+    def test_cli_with_shuffle(self, capsys):
+        """Test CLI with shuffle flag."""
+        main(MOCK_CSV, shuffle=True)
+        assert "Solver Status: Optimal" in capsys.readouterr().out
+
     def test_cli_csv_export(self):
         """Test that CSV export works."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -93,46 +141,34 @@ class TestCLI:
         assert "--output" in result.output
 
 
+class TestRunPipeline:
+    """Tests for the pipeline behind the CLI, without argument parsing."""
+
+    def test_default_run_is_optimal(self, base_result: SolverResult):
+        assert base_result.status == SolverStatus.OPTIMAL
+        assert base_result.metrics is not None
+
+    def test_default_run_assigns_every_participant(self, base_result: SolverResult):
+        assert len(base_result.participant_assignments) == 45
+        assert all(
+            a.status == AssignmentStatus.ASSIGNED
+            for a in base_result.participant_assignments.values()
+        )
+
+    def test_cli_prints_the_pipeline_result(self, base_result: SolverResult):
+        result = runner.invoke(app, [str(MOCK_CSV)])
+        assert result.exit_code == 0
+        assert f"Preference Satisfaction: {base_result.metrics.preference_satisfaction}" in (
+            result.output
+        )
+
+
 class TestOutput:
     """Tests for the output module."""
 
-    def test_print_assignment_summary_optimal(self, capsys):
+    def test_print_assignment_summary_optimal(self, capsys, summary_result: SolverResult):
         """Test pretty-print for optimal result."""
-        result = SolverResult(
-            status=SolverStatus.OPTIMAL,
-            assignments={"OptionA": ["P1", "P2"], "OptionB": ["P3"]},
-            option_counts={"OptionA": 2, "OptionB": 1},
-            participant_assignments={
-                "P1": ParticipantAssignment(
-                    option="OptionA",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=1,
-                    preference_score=5,
-                ),
-                "P2": ParticipantAssignment(
-                    option="OptionA",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=2,
-                    preference_score=4,
-                ),
-                "P3": ParticipantAssignment(
-                    option="OptionB",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=1,
-                    preference_score=5,
-                ),
-            },
-            metrics=Metrics(
-                preference_satisfaction=14,
-                active_options=2,
-                average_satisfaction=4.67,
-                objective_value=16.0,
-                preference_distribution={1: 2, 2: 1, 3: 0, 4: 0, 5: 0, "unassigned": 0},
-                unused_options=[],
-            ),
-        )
-
-        print_assignment_summary(result)
+        print_assignment_summary(summary_result)
         captured = capsys.readouterr()
 
         assert "Solver Status: Optimal" in captured.out
@@ -140,28 +176,32 @@ class TestOutput:
         assert "Active Options: 2" in captured.out
         assert "OptionA: P1, P2" in captured.out
 
-    def test_print_assignment_summary_with_violations(self, capsys):
+    def test_print_distribution_ranks_in_numeric_order(
+        self, capsys, summary_result: SolverResult
+    ):
+        """Ranks of 10 and above print after single-digit ranks, labels last."""
+        result = replace(
+            summary_result,
+            metrics=replace(
+                summary_result.metrics,
+                preference_distribution={10: 1, "unassigned": 1, 2: 1},
+            ),
+        )
+
+        print_assignment_summary(result)
+        out = capsys.readouterr().out
+
+        assert out.index("  2: 1") < out.index("  10: 1") < out.index("  unassigned: 1")
+
+    def test_print_assignment_summary_with_violations(
+        self, capsys, summary_result: SolverResult
+    ):
         """Test pretty-print shows constraint violations."""
-        result = SolverResult(
-            status=SolverStatus.OPTIMAL,
-            assignments={"OptionA": ["P1"]},
-            option_counts={"OptionA": 1},
-            participant_assignments={
-                "P1": ParticipantAssignment(
-                    option="OptionA",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=1,
-                    preference_score=5,
-                ),
-            },
-            metrics=Metrics(
-                preference_satisfaction=5,
-                active_options=1,
-                average_satisfaction=5.0,
-                objective_value=6.0,
-                preference_distribution={1: 1},
-                unused_options=[],
-                constraint_violations=["OptionA has 1 participant, but should have 0 or 2-3"],
+        result = replace(
+            summary_result,
+            metrics=replace(
+                summary_result.metrics,
+                constraint_violations=("OptionA has 1 participant, but should have 0 or 2-3",),
             ),
         )
 
@@ -171,28 +211,9 @@ class TestOutput:
         assert "Constraint Violations" in captured.out
         assert "OptionA has 1 participant" in captured.out
 
-    def test_export_results_to_csv(self):
+    def test_export_results_to_csv(self, summary_result: SolverResult):
         """Test CSV export functionality."""
-        result = SolverResult(
-            status=SolverStatus.OPTIMAL,
-            assignments={"OptionA": ["P1", "P2"]},
-            option_counts={"OptionA": 2},
-            participant_assignments={
-                "P1": ParticipantAssignment(
-                    option="OptionA",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=1,
-                    preference_score=5,
-                ),
-                "P2": ParticipantAssignment(
-                    option="OptionA",
-                    status=AssignmentStatus.ASSIGNED,
-                    preference_rank=2,
-                    preference_score=4,
-                ),
-            },
-            metrics=None,
-        )
+        result = replace(summary_result, metrics=None)
 
         with tempfile.TemporaryDirectory() as tmpdir:
             filepath = Path(tmpdir) / "test_export.csv"
@@ -202,12 +223,13 @@ class TestOutput:
                 reader = csv.DictReader(f)
                 rows = list(reader)
 
-            assert len(rows) == 2
+            assert len(rows) == 3
             assert rows[0]["participant_id"] == "P1"
             assert rows[0]["assigned_option"] == "OptionA"
             assert rows[0]["preference_rank"] == "1"
             assert rows[0]["preference_score"] == "5"
             assert rows[0]["status"] == "ASSIGNED"
+            assert rows[1]["preference_rank"] == "2"
 
     def test_export_to_invalid_path_raises_error(self):
         """Exporting to invalid path should raise OSError."""
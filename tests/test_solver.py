@@ -1,7 +1,13 @@
 """Tests for the solver module."""
 
+from pathlib import Path
+from types import MappingProxyType
+
 import pytest
+from pulp import PULP_CBC_CMD
+from pulp.constants import LpSolutionIntegerFeasible
 
+from src.data_loader import load_preferences_from_csv
 from src.solver import solve_assignment
 from src.types import (
     AssignmentStatus,
@@ -11,13 +17,46 @@ from src.types import (
     SolverStatus,
 )
 
+MOCK_PATH = Path(__file__).parent.parent / "data" / "mock_preferences.csv"
+
+# Four participants split evenly between two options; shared by the quota tests.
+# The preferences are read-only, so no test can change them under another
+PAIRED_PROBLEM = (
+    ["p1", "p2", "p3", "p4"],
+    ["o1", "o2"],
+    MappingProxyType(
+        {
+            "p1": (("o1", 5), ("o2", 4)),
+            "p2": (("o1", 5), ("o2", 4)),
+            "p3": (("o2", 5), ("o1", 4)),
+            "p4": (("o2", 5), ("o1", 4)),
+        }
+    ),
+)
 
-class TestSolverStatus:
-    def test_optimal_status_value(self):
-        assert SolverStatus.OPTIMAL.value == "Optimal"
 
-    def test_infeasible_status_value(self):
-        assert SolverStatus.INFEASIBLE.value == "Infeasible"
+def _assert_counts_in(result: SolverResult, valid_counts: set[int]) -> None:
+    """Assert every option's participant count is one of valid_counts."""
+    # Failures point at the calling test, not at this helper's loop
+    __tracebackhide__ = True
+    counts = result.option_counts
+    bad = {option: count for option, count in counts.items() if count not in valid_counts}
+    assert not bad, f"Option counts {bad} outside {valid_counts}"
+
+
+class TestSolverStatus:
+    @pytest.mark.parametrize(
+        ("status", "value"),
+        [
+            (SolverStatus.OPTIMAL, "Optimal"),
+            (SolverStatus.FEASIBLE, "Feasible"),
+            (SolverStatus.INFEASIBLE, "Infeasible"),
+            (SolverStatus.UNBOUNDED, "Unbounded"),
+            (SolverStatus.NOT_SOLVED, "Not Solved"),
+        ],
+    )
+    def test_status_value(self, status, value):
+        assert status.value == value
 
     def test_status_comparison(self):
         assert SolverStatus.OPTIMAL == SolverStatus.OPTIMAL
@@ -25,14 +64,16 @@ class TestSolverStatus:
 
 
 class TestAssignmentStatus:
-    def test_assigned_status_value(self):
-        assert AssignmentStatus.ASSIGNED.value == "ASSIGNED"
-
-    def test_unassigned_status_value(self):
-        assert AssignmentStatus.UNASSIGNED.value == "UNASSIGNED"
-
-    def test_no_preferences_status_value(self):
-        assert AssignmentStatus.NO_PREFERENCES.value == "NO_PREFERENCES"
+    @pytest.mark.parametrize(
+        ("status", "value"),
+        [
+            (AssignmentStatus.ASSIGNED, "ASSIGNED"),
+            (AssignmentStatus.UNASSIGNED, "UNASSIGNED"),
+            (AssignmentStatus.NO_PREFERENCES, "NO_PREFERENCES"),
+        ],
+    )
+    def test_status_value(self, status, value):
+        assert status.value == value
 
 
 class TestParticipantAssignment:
@@ -66,11 +107,11 @@ class TestMetrics:
             average_satisfaction=4.5,
             objective_value=110.0,
             preference_distribution={1: 10, 2: 5, 3: 3, 4: 2, 5: 0, "unassigned": 0},
-            unused_options=["Option_X"],
+            unused_options=frozenset({"Option_X"}),
         )
         assert metrics.preference_satisfaction == 100
         assert metrics.active_options == 5
-        assert metrics.constraint_violations == []
+        assert metrics.constraint_violations == ()
 
     def test_metrics_with_violations(self):
         metrics = Metrics(
@@ -79,8 +120,8 @@ class TestMetrics:
             average_satisfaction=4.5,
             objective_value=110.0,
             preference_distribution={},
-            unused_options=[],
-            constraint_violations=["Option A has 1 participant"],
+            unused_options=frozenset(),
+            constraint_violations=("Option A has 1 participant",),
         )
         assert len(metrics.constraint_violations) == 1
 
@@ -111,22 +152,6 @@ class TestQuotaValidation:
         with pytest.raises(ValueError, match="max_quota must be >= min_quota"):
             solve_assignment(["p1"], ["o1"], {}, min_quota=3, max_quota=2, option_weight=1.0)
 
-    def test_valid_quota_combination(self):
-        """Valid quota combinations should not raise."""
-        participants = ["p1", "p2", "p3", "p4"]
-        options = ["o1", "o2"]
-        preferences = {
-            "p1": [("o1", 5), ("o2", 4)],
-            "p2": [("o1", 5), ("o2", 4)],
-            "p3": [("o2", 5), ("o1", 4)],
-            "p4": [("o2", 5), ("o1", 4)],
-        }
-        # Should not raise
-        result = solve_assignment(
-            participants, options, preferences, min_quota=1, max_quota=5, option_weight=1.0
-        )
-        assert result.status == SolverStatus.OPTIMAL
-
 
 class TestCustomMinQuota:
     """Tests for various min_quota values."""
@@ -147,7 +172,7 @@ class TestCustomMinQuota:
         # With min_quota=1, o1 can have just p1
         assert result.option_counts["o1"] in [0, 1, 2, 3]
         assert result.metrics is not None
-        assert result.metrics.constraint_violations == []
+        assert result.metrics.constraint_violations == ()
 
     def test_min_quota_three_requires_three_per_option(self):
         """With min_quota=3, max_quota=3, options must have exactly 0 or 3."""
@@ -166,77 +191,67 @@ class TestCustomMinQuota:
         )
         assert result.status == SolverStatus.OPTIMAL
         # Both options should have exactly 3 participants
-        for option, count in result.option_counts.items():
-            assert count in [0, 3], f"Option {option} has {count}, expected 0 or 3"
-
-    def test_quota_two_to_three_enforces_valid_counts(self):
-        """min_quota=2, max_quota=3 enforces 0, 2, or 3."""
-        participants = ["p1", "p2", "p3", "p4"]
-        options = ["o1", "o2"]
-        preferences = {
-            "p1": [("o1", 5), ("o2", 4)],
-            "p2": [("o1", 5), ("o2", 4)],
-            "p3": [("o2", 5), ("o1", 4)],
-            "p4": [("o2", 5), ("o1", 4)],
-        }
+        _assert_counts_in(result, {0, 3})
+
+    @pytest.mark.parametrize(
+        ("min_quota", "max_quota", "valid_counts"),
+        [(2, 3, {0, 2, 3}), (1, 5, {0, 1, 2, 3, 4, 5})],
+    )
+    def test_quota_enforces_counts(self, min_quota, max_quota, valid_counts):
+        """Every option ends up empty or within [min_quota, max_quota]."""
+        participants, options, preferences = PAIRED_PROBLEM
         result = solve_assignment(
-            participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0
+            participants,
+            options,
+            preferences,
+            min_quota=min_quota,
+            max_quota=max_quota,
+            option_weight=1.0,
         )
         assert result.status == SolverStatus.OPTIMAL
-        for option, count in result.option_counts.items():
-            assert count in [0, 2, 3], f"Option {option} has {count}"
+        _assert_counts_in(result, valid_counts)
 
 
 class TestSolveAssignment:
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def simple_problem(self):
         """Simple problem with 4 participants and 2 options."""
-        participants = ["p1", "p2", "p3", "p4"]
-        options = ["o1", "o2"]
-        preferences = {
-            "p1": [("o1", 5), ("o2", 4)],
-            "p2": [("o1", 5), ("o2", 4)],
-            "p3": [("o2", 5), ("o1", 4)],
-            "p4": [("o2", 5), ("o1", 4)],
-        }
-        return participants, options, preferences
+        return PAIRED_PROBLEM
 
-    def test_returns_solver_result(self, simple_problem):
+    @pytest.fixture(scope="class")
+    def simple_result(self, simple_problem) -> SolverResult:
+        """simple_problem solved once with the default quotas, shared by the class."""
         participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        assert isinstance(result, SolverResult)
+        return solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
 
-    def test_optimal_status(self, simple_problem):
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        assert result.status == SolverStatus.OPTIMAL
+    def test_returns_solver_result(self, simple_result):
+        assert isinstance(simple_result, SolverResult)
 
-    def test_all_participants_assigned(self, simple_problem):
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        for participant in participants:
-            assert participant in result.participant_assignments
-            assert result.participant_assignments[participant].status == AssignmentStatus.ASSIGNED
+    def test_optimal_status(self, simple_result):
+        assert simple_result.status == SolverStatus.OPTIMAL
 
-    def test_option_size_constraint(self, simple_problem):
+    def test_all_participants_assigned(self, simple_problem, simple_result):
+        participants, _, _ = simple_problem
+        assert set(participants) <= simple_result.participant_assignments.keys()
+        not_assigned = [
+            p
+            for p, a in simple_result.participant_assignments.items()
+            if a.status != AssignmentStatus.ASSIGNED
+        ]
+        assert not_assigned == []
+
+    def test_option_size_constraint(self, simple_result):
         """Each option should have 0, 2, or 3 participants."""
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        for option, count in result.option_counts.items():
-            assert count in [0, 2, 3], f"Option {option} has {count} participants"
+        _assert_counts_in(simple_result, {0, 2, 3})
 
-    def test_no_constraint_violations(self, simple_problem):
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        assert result.metrics is not None
-        assert result.metrics.constraint_violations == []
+    def test_no_constraint_violations(self, simple_result):
+        assert simple_result.metrics is not None
+        assert simple_result.metrics.constraint_violations == ()
 
-    def test_metrics_calculated(self, simple_problem):
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        assert result.metrics is not None
-        assert result.metrics.preference_satisfaction > 0
-        assert result.metrics.active_options > 0
+    def test_metrics_calculated(self, simple_result):
+        assert simple_result.metrics is not None
+        assert simple_result.metrics.preference_satisfaction > 0
+        assert simple_result.metrics.active_options > 0
 
     def test_participant_without_preferences(self):
         """Participant with no preferences should get NO_PREFERENCES status."""
@@ -252,52 +267,105 @@ class TestSolveAssignment:
         result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
         assert result.participant_assignments["p5"].status == AssignmentStatus.NO_PREFERENCES
 
-    def test_preference_rank_tracking(self, simple_problem):
-        participants, options, preferences = simple_problem
-        result = solve_assignment(participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0)
-        for participant, assignment in result.participant_assignments.items():
+    def test_preference_rank_tracking(self, simple_result):
+        for participant, assignment in simple_result.participant_assignments.items():
             if assignment.status == AssignmentStatus.ASSIGNED:
                 assert assignment.preference_rank is not None
                 assert 1 <= assignment.preference_rank <= 5
 
+    def test_seed_is_reproducible_and_keeps_input(self, simple_problem):
+        participants, options, preferences = simple_problem
+        original = participants.copy()
+        result1 = solve_assignment(
+            participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0, seed=7
+        )
+        result2 = solve_assignment(
+            participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0, seed=7
+        )
+        assert participants == original
+        assert result1.participant_assignments == result2.participant_assignments
+        assert set(result1.participant_assignments) == set(participants)
 
-class TestSolverWithMockData:
-    """Integration tests using the mock preferences file."""
-
-    @pytest.fixture
-    def mock_data(self):
-        from pathlib import Path
-
-        from src.data_loader import load_preferences_from_csv
-
-        mock_path = Path(__file__).parent.parent / "data" / "mock_preferences.csv"
-        if not mock_path.exists():
-            pytest.skip("Mock data file not found")
-        return load_preferences_from_csv(str(mock_path))
+    def test_negative_seed_is_accepted(self, simple_problem):
+        participants, options, preferences = simple_problem
+        result1 = solve_assignment(
+            participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0, seed=-3
+        )
+        result2 = solve_assignment(
+            participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0, seed=-3
+        )
+        assert result1.status == SolverStatus.OPTIMAL
+        assert result1.participant_assignments == result2.participant_assignments
 
-    def test_solves_mock_data(self, mock_data):
-        participants, options, preferences = mock_data
+    def test_solver_limits_keep_simple_problem_optimal(self, simple_problem, capfd):
+        participants, options, preferences = simple_problem
         result = solve_assignment(
-            participants, options, preferences, min_quota=2, max_quota=3, option_weight=0.5
+            participants,
+            options,
+            preferences,
+            min_quota=2,
+            max_quota=3,
+            option_weight=1.0,
+            time_limit=30,
+            gap_rel=1e-4,
         )
         assert result.status == SolverStatus.OPTIMAL
+        assert "CBC" not in capfd.readouterr().out
 
-    def test_no_violations_with_mock_data(self, mock_data):
-        participants, options, preferences = mock_data
+    def test_unproven_solution_is_feasible_not_optimal(self, simple_problem, monkeypatch):
+        """A solution CBC stopped on without proving it optimal is reported FEASIBLE."""
+
+        class TimedOutCBC(PULP_CBC_CMD):
+            def actualSolve(self, lp, **kwargs):  # noqa: N802 (PuLP API name)
+                status = super().actualSolve(lp, **kwargs)
+                # What CBC leaves behind when timeLimit stops it holding an incumbent
+                lp.sol_status = LpSolutionIntegerFeasible
+                return status
+
+        monkeypatch.setattr("src.solver.PULP_CBC_CMD", TimedOutCBC)
+        participants, options, preferences = simple_problem
         result = solve_assignment(
-            participants, options, preferences, min_quota=2, max_quota=3, option_weight=0.5
+            participants,
+            options,
+            preferences,
+            min_quota=2,
+            max_quota=3,
+            option_weight=1.0,
+            time_limit=30,
         )
+        assert result.status == SolverStatus.FEASIBLE
         assert result.metrics is not None
-        assert result.metrics.constraint_violations == []
+        assert set(result.participant_assignments) == set(participants)
 
-    def test_all_participants_assigned_with_mock_data(self, mock_data):
+
+class TestSolverWithMockData:
+    """Integration tests using the mock preferences file."""
+
+    @pytest.fixture(scope="class")
+    def mock_data(self):
+        if not MOCK_PATH.exists():
+            pytest.skip("Mock data file not found")
+        return load_preferences_from_csv(MOCK_PATH)
+
+    @pytest.fixture(scope="class")
+    def mock_result(self, mock_data) -> SolverResult:
+        """The mock data solved once, shared by the class."""
         participants, options, preferences = mock_data
-        result = solve_assignment(
+        return solve_assignment(
             participants, options, preferences, min_quota=2, max_quota=3, option_weight=0.5
         )
+
+    def test_solves_mock_data(self, mock_result):
+        assert mock_result.status == SolverStatus.OPTIMAL
+
+    def test_no_violations_with_mock_data(self, mock_result):
+        assert mock_result.metrics is not None
+        assert mock_result.metrics.constraint_violations == ()
+
+    def test_all_participants_assigned_with_mock_data(self, mock_result):
         unassigned = [
             p
-            for p, a in result.participant_assignments.items()
+            for p, a in mock_result.participant_assignments.items()
             if a.status == AssignmentStatus.UNASSIGNED
         ]
         assert unassigned == [], f"Unassigned participants: {unassigned}"
@@ -319,19 +387,84 @@ class TestEdgeCases:
         )
         assert result.option_counts.get("unused_option", 0) == 0
 
-    def test_infeasible_scenario(self):
-        """Too few participants for min_quota should be infeasible."""
+    def test_unfillable_options_add_nothing_to_objective(self):
+        """Options too few participants want stay inactive and earn no option weight."""
         participants = ["p1", "p2"]
-        options = ["o1"]
+        options = ["o1", "o2", "unused_option"]
         preferences = {
-            "p1": [("o1", 5)],
-            "p2": [("o1", 4)],
+            "p1": [("o1", 2), ("o2", 1)],
+            "p2": [("o1", 2)],
         }
         result = solve_assignment(
-            participants, options, preferences, min_quota=5, max_quota=10, option_weight=1.0
+            participants, options, preferences, min_quota=2, max_quota=2, option_weight=1.0
+        )
+        assert result.status == SolverStatus.OPTIMAL
+        assert result.assignments["o1"] == ("p1", "p2")
+        assert result.metrics is not None
+        assert result.metrics.objective_value == 5.0
+
+    @pytest.mark.parametrize(
+        ("participants", "options", "preferences", "min_quota", "max_quota"),
+        [
+            pytest.param(
+                ["p1", "p2"],
+                ["o1"],
+                {"p1": [("o1", 5)], "p2": [("o1", 4)]},
+                5,
+                10,
+                id="too_few_for_min_quota",
+            ),
+            pytest.param(
+                ["p1", "p2", "p3"],
+                ["o1", "o2"],
+                {"p1": [("o1", 5)], "p2": [("o1", 5)], "p3": [("o2", 5)]},
+                2,
+                3,
+                id="only_choice_cannot_open",
+            ),
+        ],
+    )
+    def test_infeasible_scenario(self, participants, options, preferences, min_quota, max_quota):
+        """Participants who cannot all be placed within quotas make the problem infeasible."""
+        result = solve_assignment(
+            participants,
+            options,
+            preferences,
+            min_quota=min_quota,
+            max_quota=max_quota,
+            option_weight=1.0,
         )
         assert result.status == SolverStatus.INFEASIBLE
 
+    def test_capacity_shortfall_is_infeasible_without_solver(self, monkeypatch):
+        """More participants than the viable options can hold fails before CBC runs."""
+
+        def no_solver(*args, **kwargs):
+            raise AssertionError("CBC should not be invoked")
+
+        monkeypatch.setattr("src.solver.PULP_CBC_CMD", no_solver)
+        participants = ["p1", "p2", "p3", "p4"]
+        preferences = {p: [("o1", 5), ("o2", 4)] for p in participants[:3]}
+        preferences["p4"] = [("o1", 5)]
+        result = solve_assignment(
+            participants, ["o1", "o2"], preferences, min_quota=1, max_quota=1, option_weight=1.0
+        )
+        assert result.status == SolverStatus.INFEASIBLE
+        assert result.metrics is None
+
+    def test_ids_that_join_to_the_same_name(self):
+        """IDs containing underscores must not produce clashing solver variables."""
+        preferences = {
+            "a_b": [("c", 2), ("b_c", 1)],
+            "a": [("b_c", 2), ("c", 1)],
+        }
+        result = solve_assignment(
+            ["a_b", "a"], ["c", "b_c"], preferences, min_quota=1, max_quota=2, option_weight=1.0
+        )
+        assert result.status == SolverStatus.OPTIMAL
+        assert result.participant_assignments["a_b"].option == "c"
+        assert result.participant_assignments["a"].option == "b_c"
+
     def test_empty_participants(self):
         """Empty participant list should return optimal with no assignments."""
         result = solve_assignment(
@@ -352,8 +485,8 @@ class TestEdgeCases:
             participants, options, preferences, min_quota=2, max_quota=3, option_weight=1.0
         )
         assert result.status == SolverStatus.OPTIMAL
-        for p in participants:
-            assert result.participant_assignments[p].status == AssignmentStatus.NO_PREFERENCES
+        statuses = {p: a.status for p, a in result.participant_assignments.items()}
+        assert statuses == dict.fromkeys(participants, AssignmentStatus.NO_PREFERENCES)
 
 
 class TestMetricsValidation: